@@ -1 +1 @@
-from .tracer import trace
\ No newline at end of file
+from .tracer import trace, CallTracer, replay
\ No newline at end of file
@@ -1,40 +1,162 @@
 import sys
-import inspect
 import threading
 import json
+import io
 import atexit
 import os
+import pickle
+import re
+import struct
+import types
+import warnings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# ---------- BINARY TRACE FORMAT ----------
+# Each record is a (kind, site id) header followed by one pickled payload:
+# SITE -> (func_name, file_name), CALL -> params, RETURN -> return value
+_SITE, _CALL, _RETURN = 0, 1, 2
+_RECORD = struct.Struct("<Bi")
+
+# Number of output lines collected before each write when printing a tree
+_WRITE_BATCH = 4096
+
+# Indent strings shared by all text output; deeper levels are built on demand
+_INDENTS = tuple("  " * i for i in range(256))
+
+
+# ---------- SYS.MONITORING (PEP 669) ----------
+# Python 3.12+ delivers call/return events to a tool id, without the global
+# profile hook; older versions fall back to sys.setprofile
+_MONITORING = sys.version_info >= (3, 12)
+if _MONITORING:
+    _TOOL_ID = sys.monitoring.PROFILER_ID
+
+# Returned by the tracer for frames it will never record. sys.setprofile
+# ignores it; a sys.monitoring callback passes DISABLE on so the interpreter
+# stops reporting that code location at all.
+_IGNORED = sys.monitoring.DISABLE if _MONITORING else None
+
+# Filters (CallTracer._filter_key) in force when code locations were last
+# answered with DISABLE; they only need re-enabling once the filters change
+_disabled_filters = None
+
+# monitoring event -> CallTracer callback (C_RETURN/C_RAISE must go together)
+_MONITOR_CALLBACKS = (
+    ("PY_START", "_on_call"),
+    ("PY_RESUME", "_on_call"),
+    ("PY_THROW", "_on_throw"),
+    ("PY_RETURN", "_on_return"),
+    ("PY_YIELD", "_on_return"),
+    ("PY_UNWIND", "_on_unwind"),
+    ("CALL", "_on_c_call"),
+    ("C_RETURN", "_on_c_return"),
+    ("C_RAISE", "_on_c_return"),
+)
+
+# sys.monitoring events arrive from every thread, sys.setprofile only covers
+# the thread that installed it; callbacks compare against the tracing thread
+_get_ident = threading.get_ident
+
+# C callables reported as built-in calls, like sys.setprofile's c_call events
+_C_FUNCTION_TYPES = frozenset({types.BuiltinFunctionType, types.MethodDescriptorType})
 
 
 # ---------- NODE ----------
+# Shared by all leaf nodes; replaced with a list when the first child is added
+_NO_CHILDREN = ()
+# Shared params of every zero-argument call; never mutated
+_NO_PARAMS = {}
+
+
+class _Unobserved:
+    """Return value of a built-in call, which the profiler never gets to see"""
+    __slots__ = ()
+
+    def __repr__(self):
+        return "?"
+
+    def __reduce__(self):
+        return "_UNOBSERVED"  # unpickles to the module-level singleton
+
+
+# Built-in call nodes have params=None (arguments are not visible either) and
+# this as return value; printers leave out the "-> value" part for them
+_UNOBSERVED = _Unobserved()
+
+
 class Node:
-    def __init__(self, name, params, file):
+    __slots__ = ("name", "params", "file", "return_val", "children", "parent")
+
+    def __init__(self, name, params, file, parent=None):
         self.name = name
         self.params = params
         self.file = file
         self.return_val = None
-        self.children = []
+        self.children = _NO_CHILDREN
+        self.parent = parent
 
 
 # ---------- TRACER ----------
 class CallTracer:
-    def __init__(self):
-        self.call_stack = []
+    def __init__(self, include=None, exclude=None, output_path=None):
+        self.current = None  # innermost open call
+        self.depth = 0  # number of open calls
         self.root = None
         self.enabled = False
         self.save_file = None  # file path if saving enabled
+        self.output_path = output_path  # binary log used by every trace, if given
+        self.stream_file = output_path  # binary event log path if streaming
+        self.stream_text = False  # whether save() writes lines while tracing
         self.max_depth = 100  # prevent stack overflow
-        self.exclude_patterns = ['site-packages', 'threading.py', 'atexit.py']
+        self.exclude_patterns = ['site-packages', 'threading.py', 'atexit.py'] + list(exclude or [])
+        self.include_patterns = list(include or [])  # if set, only trace matching files
         self.max_param_len = 50  # max length for parameter display
         self.expand_objects = False  # whether to expand object details
         self.expand_depth = 2  # how deep to expand nested objects
         self.interactive_html = False  # whether to generate interactive HTML
         self.auto_end_registered = False
         self.trace_stdlib = False  # whether to trace standard library calls
+        self.capture_args = True  # whether to record call arguments
+        self.compress_chains = False  # whether to merge single-child call chains
         
         # Get Python's standard library path
         self.stdlib_path = os.path.dirname(os.__file__)
 
+        # id(code) -> (func_name, file_name, arg_names, ignored, code)
+        self._code_cache = {}
+        # file path -> whether calls from it are ignored, filled while tracing
+        self._file_cache = {}
+        # include/exclude checks as single regexes, built by start()
+        self._include_re = None
+        self._exclude_re = None
+        self._filter_key = None  # both patterns, compared to _disabled_filters
+        # file path -> file name shown in output; kept across traces
+        self._basename_cache = {}
+
+        # open binary log and (func_name, file_name) -> site id while streaming
+        self._stream = None
+        self._sites = {}
+        # open text stream calls as (line, func_name, file_short), innermost last;
+        # the innermost line is unwritten while _pending is set
+        self._open_calls = []
+        self._pending = False
+
+        self._in_tracer = False  # set while the tracer itself is running
+        self._monitoring = False  # whether sys.monitoring delivers the events
+        self._thread_id = None  # thread that called start(); the only one traced
+        self._prev_profile = None  # profile function active before start()
+        self._settrace = False  # whether sys.settrace delivers the events
+        self._prev_trace = None  # trace function active before start()
+        self._entered = []  # per 'with' block: whether it started tracing
+
+        # Bind the tracer once instead of creating a bound method per event
+        self._tracer = self.tracer
+
     # ---------- AUTO-END ON EXIT ----------
     def _register_auto_end(self):
         """Register automatic end on program exit"""
@@ -48,13 +170,22 @@ class CallTracer:
             self.end()
 
     # ---------- ENABLE FILE SAVE ----------
-    def save(self, filename="call_trace.txt"):
-        """Enable saving trace to file"""
+    def save(self, filename="call_trace.txt", stream=False):
+        """Enable saving trace to file, optionally line by line while tracing"""
         self.save_file = filename
+        self.stream_text = stream
         self._register_auto_end()
         self.start()
         return self  # allow chaining
 
+    # ---------- ENABLE BINARY STREAM ----------
+    def stream(self, filename="call_trace.bin"):
+        """Stream call events to a binary log instead of building the tree"""
+        self.stream_file = filename
+        self._register_auto_end()
+        self.start()
+        return self
+
     # ---------- ENABLE INTERACTIVE HTML ----------
     def interactive(self, filename="call_trace.html"):
         """Enable interactive HTML output with collapsible objects"""
@@ -77,6 +208,26 @@ class CallTracer:
     def include_stdlib(self):
         """Include standard library calls in trace"""
         self.trace_stdlib = True
+        if self.enabled:
+            # save()/interactive()/expand() already started tracing with the
+            # stdlib excluded; rebuild the filters and forget earlier decisions
+            self._compile_filters()
+            self._code_cache = {}
+            self._file_cache = {}
+            if self._monitoring:
+                self._sync_disabled_events()
+        return self
+
+    # ---------- SKIP ARGUMENTS ----------
+    def skip_args(self):
+        """Record call names and return values only, not arguments"""
+        self.capture_args = False
+        return self
+
+    # ---------- COMPRESS CHAINS ----------
+    def compress(self):
+        """Merge chains of calls that each make a single call into one line"""
+        self.compress_chains = True
         return self
 
     # ---------- FORMAT VALUE ----------
@@ -96,10 +247,10 @@ class CallTracer:
         return s
 
     # ---------- EXPAND OBJECT ----------
-    def _expand_object(self, obj, current_depth=0):
+    def _expand_object(self, obj, current_depth=0, _seen=None):
         """Recursively expand object details"""
-        indent = "  " * current_depth
-        next_indent = "  " * (current_depth + 1)
+        indent = _INDENTS[current_depth] if current_depth < 255 else "  " * current_depth
+        next_indent = _INDENTS[current_depth + 1] if current_depth < 255 else indent + "  "
         
         # Handle None
         if obj is None:
@@ -111,155 +262,175 @@ class CallTracer:
                 return f"'{obj[:100]}...'"
             return repr(obj)
         
-        # Handle lists
-        if isinstance(obj, list):
-            if not obj:
-                return "[]"
-            if current_depth >= self.expand_depth - 1:
-                return f"[{len(obj)} items]"
+        # Containers and objects on the current path would recurse forever
+        if _seen is None:
+            _seen = set()
+        if id(obj) in _seen:
+            return "<cycle>"
+        _seen.add(id(obj))
+
+        try:
+            # Handle lists
+            if isinstance(obj, list):
+                if not obj:
+                    return "[]"
+                if current_depth >= self.expand_depth - 1:
+                    return f"[{len(obj)} items]"
             
-            items = []
-            for i, item in enumerate(obj[:10]):  # limit to first 10 items
-                formatted = self._expand_object(item, current_depth + 1)
-                items.append(f"{next_indent}[{i}]: {formatted}")
+                items = []
+                for i, item in enumerate(obj[:10]):  # limit to first 10 items
+                    formatted = self._expand_object(item, current_depth + 1, _seen)
+                    items.append(f"{next_indent}[{i}]: {formatted}")
             
-            if len(obj) > 10:
-                items.append(f"{next_indent}... ({len(obj) - 10} more items)")
+                if len(obj) > 10:
+                    items.append(f"{next_indent}... ({len(obj) - 10} more items)")
             
-            return "[\n" + ",\n".join(items) + f"\n{indent}]"
-        
-        # Handle tuples
-        if isinstance(obj, tuple):
-            if not obj:
-                return "()"
-            if current_depth >= self.expand_depth - 1:
-                return f"({len(obj)} items)"
+                return "[\n" + ",\n".join(items) + f"\n{indent}]"
+        
+            # Handle tuples
+            if isinstance(obj, tuple):
+                if not obj:
+                    return "()"
+                if current_depth >= self.expand_depth - 1:
+                    return f"({len(obj)} items)"
             
-            items = []
-            for i, item in enumerate(obj[:10]):
-                formatted = self._expand_object(item, current_depth + 1)
-                items.append(f"{next_indent}[{i}]: {formatted}")
+                items = []
+                for i, item in enumerate(obj[:10]):
+                    formatted = self._expand_object(item, current_depth + 1, _seen)
+                    items.append(f"{next_indent}[{i}]: {formatted}")
             
-            if len(obj) > 10:
-                items.append(f"{next_indent}... ({len(obj) - 10} more items)")
+                if len(obj) > 10:
+                    items.append(f"{next_indent}... ({len(obj) - 10} more items)")
             
-            return "(\n" + ",\n".join(items) + f"\n{indent})"
-        
-        # Handle dictionaries
-        if isinstance(obj, dict):
-            if not obj:
-                return "{}"
-            if current_depth >= self.expand_depth - 1:
-                return f"{{{len(obj)} keys}}"
+                return "(\n" + ",\n".join(items) + f"\n{indent})"
+        
+            # Handle dictionaries
+            if isinstance(obj, dict):
+                if not obj:
+                    return "{}"
+                if current_depth >= self.expand_depth - 1:
+                    return f"{{{len(obj)} keys}}"
             
-            items = []
-            for i, (key, value) in enumerate(list(obj.items())[:10]):  # limit to first 10
-                formatted_value = self._expand_object(value, current_depth + 1)
-                items.append(f"{next_indent}{repr(key)}: {formatted_value}")
+                items = []
+                for i, (key, value) in enumerate(list(obj.items())[:10]):  # limit to first 10
+                    formatted_value = self._expand_object(value, current_depth + 1, _seen)
+                    items.append(f"{next_indent}{repr(key)}: {formatted_value}")
             
-            if len(obj) > 10:
-                items.append(f"{next_indent}... ({len(obj) - 10} more keys)")
+                if len(obj) > 10:
+                    items.append(f"{next_indent}... ({len(obj) - 10} more keys)")
             
-            return "{\n" + ",\n".join(items) + f"\n{indent}}}"
+                return "{\n" + ",\n".join(items) + f"\n{indent}}}"
         
-        # Handle sets
-        if isinstance(obj, set):
-            if not obj:
-                return "set()"
-            if current_depth >= self.expand_depth - 1:
-                return f"{{{len(obj)} items}}"
-            return "{" + ", ".join(repr(item) for item in list(obj)[:10]) + "}"
-        
-        # Handle custom objects
-        try:
-            if hasattr(obj, '__dict__'):
+            # Handle sets
+            if isinstance(obj, set):
+                if not obj:
+                    return "set()"
                 if current_depth >= self.expand_depth - 1:
-                    return f"<{obj.__class__.__name__} object>"
+                    return f"{{{len(obj)} items}}"
+                return "{" + ", ".join(repr(item) for item in list(obj)[:10]) + "}"
+        
+            # Handle custom objects
+            try:
+                if hasattr(obj, '__dict__'):
+                    if current_depth >= self.expand_depth - 1:
+                        return f"<{obj.__class__.__name__} object>"
                 
-                attrs = {}
-                for key, value in obj.__dict__.items():
-                    if not key.startswith('_'):  # skip private attributes
-                        attrs[key] = self._expand_object(value, current_depth + 1)
+                    attrs = {}
+                    for key, value in obj.__dict__.items():
+                        if not key.startswith('_'):  # skip private attributes
+                            attrs[key] = self._expand_object(value, current_depth + 1, _seen)
                 
-                if not attrs:
-                    return f"<{obj.__class__.__name__} object>"
+                    if not attrs:
+                        return f"<{obj.__class__.__name__} object>"
                 
-                items = [f"{next_indent}{key}: {value}" for key, value in list(attrs.items())[:10]]
-                return f"<{obj.__class__.__name__}>\n" + "\n".join(items) + f"\n{indent}"
-        except:
-            pass
-        
-        # Fallback to repr
-        s = repr(obj)
-        if len(s) > 200:
-            return s[:200] + "..."
-        return s
+                    items = [f"{next_indent}{key}: {value}" for key, value in list(attrs.items())[:10]]
+                    return f"<{obj.__class__.__name__}>\n" + "\n".join(items) + f"\n{indent}"
+            except:
+                pass
+        
+            # Fallback to repr
+            s = repr(obj)
+            if len(s) > 200:
+                return s[:200] + "..."
+            return s
+        finally:
+            _seen.discard(id(obj))
 
     # ---------- CONVERT TO JSON-SERIALIZABLE ----------
-    def _to_serializable(self, obj, current_depth=0, max_depth=10):
+    def _to_serializable(self, obj, current_depth=0, max_depth=10, _seen=None):
         """Convert object to JSON-serializable format for interactive viewer"""
         if current_depth > max_depth:
             return {"type": "max_depth", "value": "..."}
         
-        # Handle None
-        if obj is None:
-            return {"type": "null", "value": None}
-        
-        # Handle primitives
-        if isinstance(obj, bool):
-            return {"type": "boolean", "value": obj}
-        if isinstance(obj, (int, float)):
-            return {"type": "number", "value": obj}
-        if isinstance(obj, str):
-            return {"type": "string", "value": obj}
-        
-        # Handle lists
-        if isinstance(obj, list):
-            return {
-                "type": "array",
-                "length": len(obj),
-                "value": [self._to_serializable(item, current_depth + 1, max_depth) for item in obj]
-            }
+        # JSON primitives are emitted as-is; the viewer tells them apart by typeof
+        if obj is None or isinstance(obj, (bool, int, float, str)):
+            return obj
         
-        # Handle tuples
-        if isinstance(obj, tuple):
-            return {
-                "type": "tuple",
-                "length": len(obj),
-                "value": [self._to_serializable(item, current_depth + 1, max_depth) for item in obj]
-            }
+        # Containers and objects on the current path would recurse forever
+        if _seen is None:
+            _seen = set()
+        if id(obj) in _seen:
+            return {"type": "cycle", "value": "<cycle>"}
+        _seen.add(id(obj))
+
+        try:
+            # Handle lists
+            if isinstance(obj, list):
+                return {
+                    "type": "array",
+                    "length": len(obj),
+                    "value": [self._to_serializable(item, current_depth + 1, max_depth, _seen) for item in obj]
+                }
         
-        # Handle dictionaries
-        if isinstance(obj, dict):
-            return {
-                "type": "object",
-                "keys": list(obj.keys()),
-                "value": {str(k): self._to_serializable(v, current_depth + 1, max_depth) for k, v in obj.items()}
-            }
+            # Handle tuples
+            if isinstance(obj, tuple):
+                return {
+                    "type": "tuple",
+                    "length": len(obj),
+                    "value": [self._to_serializable(item, current_depth + 1, max_depth, _seen) for item in obj]
+                }
         
-        # Handle sets
-        if isinstance(obj, set):
-            return {
-                "type": "set",
-                "length": len(obj),
-                "value": [self._to_serializable(item, current_depth + 1, max_depth) for item in obj]
-            }
+            # Handle dictionaries
+            if isinstance(obj, dict):
+                return {
+                    "type": "object",
+                    "keys": list(obj.keys()),
+                    "value": {str(k): self._to_serializable(v, current_depth + 1, max_depth, _seen) for k, v in obj.items()}
+                }
         
-        # Handle custom objects
-        try:
-            if hasattr(obj, '__dict__'):
-                attrs = {k: self._to_serializable(v, current_depth + 1, max_depth) 
-                        for k, v in obj.__dict__.items() if not k.startswith('_')}
+            # Handle sets
+            if isinstance(obj, set):
                 return {
-                    "type": "custom",
-                    "class": obj.__class__.__name__,
-                    "value": attrs
+                    "type": "set",
+                    "length": len(obj),
+                    "value": [self._to_serializable(item, current_depth + 1, max_depth, _seen) for item in obj]
                 }
-        except:
-            pass
         
-        # Fallback to string representation
-        return {"type": "unknown", "value": str(obj)}
+            # Handle custom objects
+            try:
+                if hasattr(obj, '__dict__'):
+                    attrs = {k: self._to_serializable(v, current_depth + 1, max_depth, _seen) 
+                            for k, v in obj.__dict__.items() if not k.startswith('_')}
+                    return {
+                        "type": "custom",
+                        "class": obj.__class__.__name__,
+                        "value": attrs
+                    }
+            except:
+                pass
+        
+            # Fallback to string representation
+            return {"type": "unknown", "value": str(obj)}
+        finally:
+            _seen.discard(id(obj))
+
+    def _basename(self, file_name):
+        """File name without its directory, memoized per path"""
+        short = self._basename_cache.get(file_name)
+        if short is None:
+            short = os.path.basename(file_name) or file_name
+            self._basename_cache[file_name] = short
+        return short
 
     # ---------- SHOULD IGNORE ----------
     def _should_ignore(self, file_name, func_name):
@@ -268,95 +439,415 @@ class CallTracer:
         if func_name.startswith("<"):
             return True
         
-        # Ignore internal tracer methods
-        if func_name in ['tracer', '_should_ignore', '_format_value', '_expand_object',
-                         'start', 'end', '__enter__', '__exit__', 'expand', 'interactive',
-                         'print_tree', 'write_to_file', '_write_tree', '_to_serializable',
-                         'save', 'include_stdlib', '_node_to_dict', '_generate_html', 
-                         '_register_auto_end', '_auto_end']:
+        # Ignore the tracer's own methods; matched by file, not by name, so
+        # user functions called e.g. 'start' or 'compress' are still traced
+        if file_name == __file__:
             return True
         
-        # Ignore patterns in file path
-        if any(pattern in file_name for pattern in self.exclude_patterns):
+        # File checks only depend on the path, so decide once per file
+        ignored = self._file_cache.get(file_name)
+        if ignored is None:
+            ignored = self._should_ignore_file(file_name)
+            self._file_cache[file_name] = ignored
+        return ignored
+
+    def _should_ignore_file(self, file_name):
+        """Check if calls from a file should be ignored"""
+        # Only trace included files when an include list is given
+        if self._include_re is not None and self._include_re.search(file_name) is None:
             return True
         
-        # Ignore standard library unless explicitly enabled
+        # Ignore patterns in file path and, unless enabled, the standard library
+        return self._exclude_re is not None and self._exclude_re.search(file_name) is not None
+
+    def _compile_filters(self):
+        """Build the regexes used by _should_ignore_file from the current settings"""
+        if self.include_patterns:
+            self._include_re = re.compile("|".join(map(re.escape, self.include_patterns)))
+        else:
+            self._include_re = None
+
+        excluded = [re.escape(pattern) for pattern in self.exclude_patterns]
         if not self.trace_stdlib:
-            # Check if file is in standard library
-            if file_name.startswith(self.stdlib_path):
-                return True
-        
-        return False
+            excluded.append("^" + re.escape(self.stdlib_path))
+        self._exclude_re = re.compile("|".join(excluded)) if excluded else None
+        self._filter_key = tuple(r and r.pattern for r in (self._include_re, self._exclude_re))
 
     # ---------- TRACER CORE ----------
     def tracer(self, frame, event, arg):
-        if not self.enabled:
-            return self.tracer
+        # skip disabled tracing and events raised by our own formatting code
+        if not self.enabled or self._in_tracer:
+            return None
 
-        func_name = frame.f_code.co_name
-        file_name = frame.f_code.co_filename
+        self._in_tracer = True
+        try:
+            # code objects are immutable, so introspect each one only once
+            code = frame.f_code
+            info = self._code_cache.get(id(code))
+            if info is None:
+                # Positional and keyword-only argument names lead co_varnames
+                nargs = code.co_argcount + code.co_kwonlyargcount
+                # ignore internal/system calls; decided once per code object
+                ignored = self._should_ignore(code.co_filename, code.co_name)
+                # keep the code object alive so its id cannot be reused
+                info = (code.co_name, code.co_filename, code.co_varnames[:nargs], ignored, code)
+                self._code_cache[id(code)] = info
+            func_name, file_name, names, ignored, _ = info
+            if ignored:
+                return _IGNORED
 
-        # ignore internal/system calls
-        if self._should_ignore(file_name, func_name):
-            return self.tracer
+            # attributes read on every event, bound once
+            stream = self._stream
+            tracer = self._tracer
 
-        # prevent stack overflow
-        if len(self.call_stack) > self.max_depth:
-            return None
+            # prevent stack overflow: calls nested deeper than max_depth are
+            # counted but not recorded, so their returns pair up with them
+            # and recording resumes once the program is back above the limit
+            depth = self.depth
+            if depth > self.max_depth:
+                if event == "call" or event == "c_call":
+                    self.depth = depth + 1
+                    return tracer
+                if depth > self.max_depth + 1 and event != "exception":
+                    self.depth = depth - 1
+                    return tracer
 
-        # ---------- FUNCTION CALL ----------
-        if event == "call":
-            frame.f_trace = self.tracer  # ⭐ critical for nested tracing
+            # ---------- FUNCTION CALL ----------
+            if event == "call":
+                if not self.capture_args:
+                    params = None
+                elif not names:
+                    # zero-argument calls share one dict and skip f_locals
+                    params = _NO_PARAMS
+                # Store raw values for interactive mode
+                elif self.interactive_html and stream is None:
+                    loc = frame.f_locals
+                    params = {n: loc[n] for n in names}
+                elif self.expand_objects:
+                    loc = frame.f_locals
+                    params = {n: self._format_value(loc[n]) for n in names}
+                else:
+                    # _format_value's truncated repr, inlined for the common case
+                    loc = frame.f_locals
+                    limit = self.max_param_len
+                    params = {}
+                    for n in names:
+                        text = repr(loc[n])
+                        params[n] = text if len(text) <= limit else text[:limit] + "..."
 
-            arg_info = inspect.getargvalues(frame)
-            
-            # Store raw values for interactive mode
-            if self.interactive_html:
-                params = {a: arg_info.locals[a] for a in arg_info.args}
-            else:
-                params = {a: self._format_value(arg_info.locals[a]) for a in arg_info.args}
+                if stream is not None:
+                    self._stream_call(func_name, file_name, params)
+                    self.depth += 1
+                    return tracer
 
-            node = Node(func_name, params, file_name)
+                parent = self.current
+                node = Node(func_name, params, file_name, parent)
 
-            if self.call_stack:
-                self.call_stack[-1].children.append(node)
-            else:
-                self.root = node
+                if parent is None:
+                    self.root = node
+                elif parent.children is _NO_CHILDREN:
+                    parent.children = [node]
+                else:
+                    parent.children.append(node)
+
+                self.current = node
+                self.depth += 1
+                return tracer
 
-            self.call_stack.append(node)
-            return self.tracer
+            # ---------- BUILT-IN CALL ----------
+            elif event == "c_call":
+                # arg is the C function object; the frame is the caller's.
+                # Its __name__ is a new string on every access, so intern it
+                # to let all nodes of one built-in share a single name.
+                c_name = sys.intern(arg.__name__)
+                if stream is not None:
+                    self._stream_call(c_name, file_name, None)
+                    self.depth += 1
+                    return tracer
 
-        # ---------- FUNCTION RETURN ----------
-        elif event == "return":
-            if self.call_stack:
-                node = self.call_stack.pop()
-                if self.interactive_html:
-                    node.return_val = arg
+                parent = self.current
+                node = Node(c_name, None, file_name, parent)
+                node.return_val = _UNOBSERVED
+
+                if parent is None:
+                    self.root = node
+                elif parent.children is _NO_CHILDREN:
+                    parent.children = [node]
                 else:
-                    node.return_val = self._format_value(arg)
+                    parent.children.append(node)
+
+                self.current = node
+                self.depth += 1
+                return tracer
+
+            # ---------- FUNCTION RETURN ----------
+            elif event == "return":
+                if stream is not None:
+                    if self.depth:
+                        self._stream_return(self._format_value(arg))
+                        self.depth -= 1
+                    return tracer
+
+                node = self.current
+                if node is not None:
+                    self.current = node.parent
+                    self.depth -= 1
+                    if self.interactive_html:
+                        node.return_val = arg
+                    else:
+                        node.return_val = self._format_value(arg)
+
+                return tracer
+
+            # ---------- BUILT-IN RETURN ----------
+            elif event in ("c_return", "c_exception"):
+                # the profiler does not see the result of a C function
+                if stream is not None:
+                    if self.depth:
+                        self._stream_return(_UNOBSERVED)
+                        self.depth -= 1
+                    return tracer
 
-            return self.tracer
+                node = self.current
+                if node is not None:
+                    self.current = node.parent
+                    self.depth -= 1
 
-        return self.tracer
+                return tracer
+
+            return tracer
+        finally:
+            self._in_tracer = False
+
+    # ---------- STREAM EVENTS ----------
+    def _stream_call(self, func_name, file_name, params):
+        """Append a call record, announcing the call site on first use"""
+        if self.stream_text:
+            self._stream_call_line(func_name, file_name, params)
+            return
+
+        out = self._stream
+        site = (func_name, file_name)
+        site_id = self._sites.get(site)
+        if site_id is None:
+            site_id = len(self._sites)
+            self._sites[site] = site_id
+            out.write(_RECORD.pack(_SITE, site_id))
+            pickle.dump(site, out, pickle.HIGHEST_PROTOCOL)
+        out.write(_RECORD.pack(_CALL, site_id))
+        pickle.dump(params, out, pickle.HIGHEST_PROTOCOL)
+
+    def _stream_return(self, return_val):
+        """Append a return record for the innermost open call"""
+        if self.stream_text:
+            self._stream_return_line(return_val)
+            return
+
+        self._stream.write(_RECORD.pack(_RETURN, 0))
+        pickle.dump(return_val, self._stream, pickle.HIGHEST_PROTOCOL)
+
+    # A call that returns before making any traced call is written as one
+    # print_tree style line; a call with children gets an opening line and a
+    # closing "name -> value" line at the same indent.
+    def _stream_call_line(self, func_name, file_name, params):
+        """Start a text line for a call, flushing its parent's opening line"""
+        open_calls = self._open_calls
+        if self._pending:
+            line, _, file_short = open_calls[-1]
+            self._stream.write("%s [%s]\n" % (line, file_short))
+
+        if params is None:
+            param_str = "..."  # arguments were not captured
+        elif not params:
+            param_str = ""
+        else:
+            param_str = ", ".join(["%s=%s" % kv for kv in params.items()])
+        depth = len(open_calls)
+        line = "%s%s(%s)" % (
+            _INDENTS[depth] if depth < 256 else "  " * depth, func_name, param_str)
+        open_calls.append((line, func_name, self._basename(file_name)))
+        self._pending = True
+
+    def _stream_return_line(self, return_val):
+        """Finish the text line(s) of the innermost open call"""
+        line, func_name, file_short = self._open_calls.pop()
+        arrow = "" if return_val is _UNOBSERVED else " -> %s" % (return_val,)
+        if self._pending:
+            self._stream.write("%s%s [%s]\n" % (line, arrow, file_short))
+            self._pending = False
+        else:
+            depth = len(self._open_calls)
+            self._stream.write("%s%s%s\n" % (
+                _INDENTS[depth] if depth < 256 else "  " * depth, func_name, arrow))
+
+    # ---------- SYS.MONITORING ----------
+    def _start_monitoring(self):
+        """Register sys.monitoring callbacks; False if the tool id is taken"""
+        mon = sys.monitoring
+        try:
+            mon.use_tool_id(_TOOL_ID, "pytrace-method")
+        except ValueError:
+            return False  # another profiler (e.g. cProfile) holds the id
+
+        self._sync_disabled_events()
+
+        events = 0
+        for name, callback in _MONITOR_CALLBACKS:
+            event = getattr(mon.events, name)
+            mon.register_callback(_TOOL_ID, event, getattr(self, callback))
+            events |= event
+        mon.set_events(_TOOL_ID, events)
+        return True
+
+    def _sync_disabled_events(self):
+        """Undo earlier DISABLEs if they were made under different filters"""
+        global _disabled_filters
+        # restart_events() is global and re-enables other tools' events too,
+        # so only call it when our ignore decisions may have changed
+        if _disabled_filters != self._filter_key:
+            sys.monitoring.restart_events()
+            _disabled_filters = self._filter_key
+
+    def _stop_monitoring(self):
+        """Unregister the sys.monitoring callbacks and release the tool id"""
+        mon = sys.monitoring
+        mon.set_events(_TOOL_ID, 0)
+        for name, _ in _MONITOR_CALLBACKS:
+            mon.register_callback(_TOOL_ID, getattr(mon.events, name), None)
+        mon.free_tool_id(_TOOL_ID)
+
+    # The callbacks map monitoring events onto the sys.setprofile events the
+    # tracer understands; sys._getframe(1) is the frame that raised the event.
+    # Only local events (PY_START/RESUME/RETURN/YIELD, CALL) may be disabled.
+    # Events from other threads are dropped before reaching the tracer and
+    # never answered with DISABLE, which would hide that code from this thread.
+    def _on_call(self, code, instruction_offset):
+        if _get_ident() != self._thread_id:
+            return None
+        if self._tracer(sys._getframe(1), "call", None) is _IGNORED:
+            return _IGNORED
+
+    def _on_throw(self, code, instruction_offset, exception):
+        if _get_ident() == self._thread_id:
+            self._tracer(sys._getframe(1), "call", None)
+
+    def _on_return(self, code, instruction_offset, retval):
+        if _get_ident() != self._thread_id:
+            return None
+        if self._tracer(sys._getframe(1), "return", retval) is _IGNORED:
+            return _IGNORED
+
+    def _on_unwind(self, code, instruction_offset, exception):
+        if _get_ident() == self._thread_id:
+            self._tracer(sys._getframe(1), "return", None)
+
+    def _on_c_call(self, code, instruction_offset, callable_, arg0):
+        # CALL fires for every call site, whatever the callee; disable the
+        # call sites of ignored code, which the cache has already classified
+        info = self._code_cache.get(id(code))
+        if info is not None and info[3]:
+            return _IGNORED
+        # only C functions become nodes here
+        if type(callable_) in _C_FUNCTION_TYPES and _get_ident() == self._thread_id:
+            if self._tracer(sys._getframe(1), "c_call", callable_) is _IGNORED:
+                return _IGNORED
+
+    def _on_c_return(self, code, instruction_offset, callable_, arg0):
+        if type(callable_) in _C_FUNCTION_TYPES and _get_ident() == self._thread_id:
+            self._tracer(sys._getframe(1), "c_return", callable_)
 
     # ---------- START TRACING ----------
     def start(self):
         if not self.enabled:  # Only start if not already enabled
-            self.call_stack = []
+            self.current = None
+            self.depth = 0
             self.root = None
+            self._code_cache = {}
+            self._file_cache = {}
+            self._compile_filters()
+            if self.stream_file:
+                # large buffer so events reach the disk in few syscalls
+                self._stream = open(self.stream_file, "wb", buffering=1 << 20)
+                self._sites = {}
+                self.stream_text = False
+            elif self.save_file and self.stream_text and not self.interactive_html:
+                self._stream = open(self.save_file, "w", encoding="utf-8", buffering=1 << 20)
+                self._stream.write("CALL TRACE:\n\n")
+                self._open_calls = []
+                self._pending = False
+            self._thread_id = _get_ident()
             self.enabled = True
-            sys.settrace(self.tracer)
+            self._monitoring = _MONITORING and self._start_monitoring()
+            if not self._monitoring:
+                prev = sys.getprofile()
+                if prev is None or callable(prev):
+                    self._prev_profile = prev
+                    sys.setprofile(self._chain_profile(prev))
+                else:
+                    # a C profiler such as cProfile holds the hook; it can be
+                    # neither chained nor restored, so leave it running
+                    warnings.warn(
+                        "another profiler is active; tracing with sys.settrace, "
+                        "built-in calls will not be recorded", RuntimeWarning, stacklevel=2)
+                    self._settrace = True
+                    self._prev_trace = sys.gettrace()
+                    sys.settrace(self._trace_hook)
         return self  # allow chaining
 
+    def _chain_profile(self, prev):
+        """Profile function that keeps feeding an already installed one"""
+        if prev is None:
+            return self._tracer
+
+        tracer = self._tracer
+
+        def chained(frame, event, arg):
+            prev(frame, event, arg)
+            return tracer(frame, event, arg)
+
+        return chained
+
+    def _trace_hook(self, frame, event, arg):
+        """sys.settrace entry point, used while a C profiler holds the profile hook"""
+        # only call/return matter; keep the interpreter from sending line events
+        frame.f_trace_lines = False
+        result = self._tracer(frame, event, arg)
+        # DISABLE only means something to sys.monitoring; as a local trace
+        # function the interpreter would try to call it
+        return None if result is _IGNORED else result
+
     # ---------- END TRACING ----------
     def end(self):
         if not self.enabled:
             return
             
-        sys.settrace(None)
+        if self._monitoring:
+            self._stop_monitoring()
+        elif self._settrace:
+            sys.settrace(self._prev_trace)
+            self._prev_trace = None
+            self._settrace = False
+        else:
+            sys.setprofile(self._prev_profile)
+            self._prev_profile = None
         self.enabled = False
 
-        if self.interactive_html:
+        if self.compress_chains and self.root is not None:
+            self._compress_chains(self.root)
+
+        if self._stream is not None and self.stream_text:
+            # calls still open when tracing stopped return None, as in the tree
+            while self._open_calls:
+                self._stream_return_line(None)
+            self._stream.close()
+            self._stream = None
+            print(f"\n✓ Trace streamed to {self.save_file}")
+        elif self._stream is not None:
+            self._stream.close()
+            self._stream = None
+            print(f"\n✓ Binary trace saved to {self.stream_file}")
+            print(f"  Load it with replay({self.stream_file!r}) to rebuild the call tree")
+        elif self.interactive_html:
             self._generate_html(self.save_file)
         else:
             self.print_tree()
@@ -367,36 +858,94 @@ class CallTracer:
         self.expand_objects = False
         self.interactive_html = False
         self.trace_stdlib = False
+        self.capture_args = True
+        self.compress_chains = False
+        self.stream_file = self.output_path
+
+    # ---------- COMPRESS SINGLE-CHILD CHAINS ----------
+    def _compress_chains(self, root):
+        """Fold each chain of single-child calls into its first node"""
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            # built-in calls are never folded: their return value is unknown
+            # and would replace the Python call's real one
+            while (len(node.children) == 1 and node.return_val is not _UNOBSERVED
+                   and node.children[0].return_val is not _UNOBSERVED):
+                child = node.children[0]
+                node.name += "→" + child.name
+                if node.params is None or child.params is None:
+                    node.params = None
+                else:
+                    node.params = {**node.params, **child.params}
+                node.return_val = child.return_val
+                node.children = child.children
+                for grandchild in node.children:
+                    grandchild.parent = node
+            stack.extend(node.children)
 
     # ---------- CONTEXT MANAGER ----------
     def __enter__(self):
         """Enable use with 'with' statement"""
+        # a nested block joins the running trace instead of restarting it
+        self._entered.append(not self.enabled)
         self.start()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Automatically end tracing when exiting context"""
-        self.end()
+        if self._entered.pop():
+            self.end()
         return False  # don't suppress exceptions
 
     # ---------- PRINT TREE ----------
     def print_tree(self, node=None, indent=0):
+        write = sys.stdout.write
         if node is None:
             node = self.root
-            print("\nCALL TRACE:\n")
+            write("\nCALL TRACE:\n\n")
 
         if node is None:
-            print("No calls traced.")
+            write("No calls traced.\n")
             return
 
-        space = "  " * indent
-        param_str = ", ".join(f"{k}={v}" for k, v in node.params.items())
-        file_short = node.file.split("/")[-1]
+        # lines are written in batches to avoid one write per node
+        parts = []
+        for line in self._tree_lines(node, indent):
+            parts.append(line)
+            if len(parts) >= _WRITE_BATCH:
+                write("".join(parts))
+                parts.clear()
+
+        write("".join(parts))
 
-        print(f"{space}{node.name}({param_str}) -> {node.return_val} [{file_short}]")
+    # ---------- TREE LINES ----------
+    def _tree_lines(self, node, indent=0):
+        """Yield one text line per node in depth-first order"""
+        # explicit stack instead of recursion, so deep trees cannot overflow
+        stack = [(node, indent)]
+        while stack:
+            node, indent = stack.pop()
 
-        for child in node.children:
-            self.print_tree(child, indent + 1)
+            params = node.params
+            if params is None:
+                param_str = "..."  # arguments were not captured
+            elif not params:
+                param_str = ""
+            else:
+                # a list lets join size the result in one pass
+                param_str = ", ".join(["%s=%s" % kv for kv in params.items()])
+            file_short = self._basename(node.file)
+
+            if node.return_val is _UNOBSERVED:
+                arrow = ""
+            else:
+                arrow = " -> %s" % (node.return_val,)
+
+            yield "%s%s(%s)%s [%s]\n" % (
+                _INDENTS[indent] if indent < 256 else "  " * indent, node.name, param_str, arrow, file_short)
+
+            stack.extend((child, indent + 1) for child in reversed(node.children))
 
     # ---------- WRITE TO FILE ----------
     def write_to_file(self, filename):
@@ -409,14 +958,7 @@ class CallTracer:
             file.write("No calls traced.\n")
             return
 
-        space = "  " * indent
-        param_str = ", ".join(f"{k}={v}" for k, v in node.params.items())
-        file_short = node.file.split("/")[-1]
-
-        file.write(f"{space}{node.name}({param_str}) -> {node.return_val} [{file_short}]\n")
-
-        for child in node.children:
-            self._write_tree(child, file, indent + 1)
+        file.writelines(self._tree_lines(node, indent))
 
     # ---------- NODE TO DICT ----------
     def _node_to_dict(self, node):
@@ -424,63 +966,146 @@ class CallTracer:
         if node is None:
             return None
         
-        return {
-            "name": node.name,
-            "file": node.file.split("/")[-1],
-            "params": {k: self._to_serializable(v) for k, v in node.params.items()},
-            "return_val": self._to_serializable(node.return_val),
-            "children": [self._node_to_dict(child) for child in node.children]
-        }
+        # pre-order list; walking it backwards converts children before parents
+        order = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            order.append(current)
+            stack.extend(reversed(current.children))
+
+        converted = {}
+        for index in range(len(order) - 1, -1, -1):
+            current = order[index]
+            params = current.params
+            entry = {
+                "id": index,  # pre-order position, stable between renders
+                "name": current.name,
+                "file": self._basename(current.file),
+                # null when the arguments were not captured or not visible
+                "params": None if params is None else {k: self._to_serializable(v) for k, v in params.items()},
+            }
+            # built-in calls have no observed return value; leave it out
+            if current.return_val is not _UNOBSERVED:
+                entry["return_val"] = self._to_serializable(current.return_val)
+            entry["children"] = [converted.pop(id(child)) for child in current.children]
+            converted[id(current)] = entry
+        return converted[id(node)]
 
     # ---------- GENERATE HTML ----------
     def _generate_html(self, filename):
         """Generate interactive HTML with collapsible objects"""
         tree_data = self._node_to_dict(self.root)
         
-        html_content = f"""<!DOCTYPE html>
+        with open(filename, 'wb') as f:
+            f.write(_HTML_PRE)
+            self._write_json(tree_data, f)
+            f.write(_HTML_POST)
+        
+        print(f"\n✓ Interactive trace saved to {filename}")
+        print(f"  Open it in your browser to explore the call tree!")
+
+    def _write_json(self, data, f):
+        """Write data as indented JSON to a binary file, using orjson if installed"""
+        if orjson is not None:
+            try:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+                return
+            except TypeError:
+                # orjson rejects ints wider than 64 bits; json handles them
+                pass
+        text = io.TextIOWrapper(f, encoding='utf-8')
+        json.dump(data, text, indent=2)
+        text.detach()
+
+
+# ---------- REPLAY BINARY TRACE ----------
+def replay(filename):
+    """Rebuild the call tree from a binary trace written by stream()
+
+    The file is unpickled, so only load traces you wrote yourself.
+    Returns the root Node, e.g. for trace.print_tree(replay(filename)).
+    """
+    sites = {}
+    root = current = None
+    with open(filename, "rb") as f:
+        while True:
+            header = f.read(_RECORD.size)
+            if not header:
+                break
+            kind, site_id = _RECORD.unpack(header)
+            payload = pickle.load(f)
+
+            if kind == _SITE:
+                sites[site_id] = payload
+            elif kind == _CALL:
+                func_name, file_name = sites[site_id]
+                node = Node(func_name, payload, file_name, current)
+                if current is None:
+                    root = node
+                elif current.children is _NO_CHILDREN:
+                    current.children = [node]
+                else:
+                    current.children.append(node)
+                current = node
+            elif current is not None:
+                current.return_val = payload
+                current = current.parent
+
+    return root
+
+
+# ---------- GLOBAL INSTANCE ----------
+trace = CallTracer()
+
+
+# ---------- HTML TEMPLATE ----------
+# Static page around the JSON tree written by _generate_html, pre-encoded
+# because the file is written in binary mode
+_HTML_PRE = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Call Trace - Interactive</title>
     <style>
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: 'Consolas', 'Monaco', 'Courier New', monospace;
             background: #1e1e1e;
             color: #d4d4d4;
             padding: 20px;
             font-size: 14px;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1400px;
             margin: 0 auto;
-        }}
+        }
         
-        h1 {{
+        h1 {
             color: #4ec9b0;
             margin-bottom: 20px;
             font-size: 24px;
-        }}
+        }
         
-        .call-tree {{
+        .call-tree {
             background: #252526;
             border-radius: 8px;
             padding: 20px;
-        }}
+        }
         
-        .call-node {{
+        .call-node {
             margin: 8px 0;
             margin-left: 20px;
-        }}
+        }
         
-        .call-header {{
+        .call-header {
             display: flex;
             align-items: center;
             gap: 8px;
@@ -490,121 +1115,121 @@ class CallTracer:
             border-left: 3px solid #007acc;
             cursor: pointer;
             transition: background 0.2s;
-        }}
+        }
         
-        .call-header:hover {{
+        .call-header:hover {
             background: #3e3e42;
-        }}
+        }
         
-        .toggle {{
+        .toggle {
             color: #858585;
             user-select: none;
             width: 16px;
             text-align: center;
-        }}
+        }
         
-        .func-name {{
+        .func-name {
             color: #dcdcaa;
             font-weight: bold;
-        }}
+        }
         
-        .params {{
+        .params {
             color: #9cdcfe;
-        }}
+        }
         
-        .return-arrow {{
+        .return-arrow {
             color: #858585;
             margin: 0 8px;
-        }}
+        }
         
-        .return-value {{
+        .return-value {
             color: #ce9178;
-        }}
+        }
         
-        .file {{
+        .file {
             color: #858585;
             font-size: 12px;
             margin-left: auto;
-        }}
+        }
         
-        .object-viewer {{
+        .object-viewer {
             margin: 10px 0 10px 40px;
             background: #1e1e1e;
             border-radius: 4px;
             padding: 10px;
             border-left: 2px solid #3e3e42;
-        }}
+        }
         
-        .object-viewer.collapsed {{
+        .object-viewer.collapsed {
             display: none;
-        }}
+        }
         
-        .obj-line {{
+        .obj-line {
             margin: 4px 0;
             display: flex;
             align-items: flex-start;
-        }}
+        }
         
-        .obj-key {{
+        .obj-key {
             color: #9cdcfe;
             margin-right: 8px;
-        }}
+        }
         
-        .obj-value {{
+        .obj-value {
             color: #ce9178;
-        }}
+        }
         
-        .obj-type {{
+        .obj-type {
             color: #4ec9b0;
             font-style: italic;
-        }}
+        }
         
-        .obj-expand {{
+        .obj-expand {
             color: #858585;
             cursor: pointer;
             user-select: none;
             margin-right: 8px;
-        }}
+        }
         
-        .obj-expand:hover {{
+        .obj-expand:hover {
             color: #d4d4d4;
-        }}
+        }
         
-        .obj-content {{
+        .obj-content {
             margin-left: 20px;
-        }}
+        }
         
-        .obj-content.collapsed {{
+        .obj-content.collapsed {
             display: none;
-        }}
+        }
         
-        .primitive {{
+        .primitive {
             color: #b5cea8;
-        }}
+        }
         
-        .string {{
+        .string {
             color: #ce9178;
-        }}
+        }
         
-        .number {{
+        .number {
             color: #b5cea8;
-        }}
+        }
         
-        .boolean {{
+        .boolean {
             color: #569cd6;
-        }}
+        }
         
-        .null {{
+        .null {
             color: #569cd6;
-        }}
+        }
         
-        .children {{
+        .children {
             margin-left: 0px;
-        }}
+        }
         
-        .children.collapsed {{
+        .children.collapsed {
             display: none;
-        }}
+        }
     </style>
 </head>
 <body>
@@ -614,208 +1239,205 @@ class CallTracer:
     </div>
 
     <script>
-        const traceData = {json.dumps(tree_data, indent=2)};
+        const traceData = """.encode("utf-8")
+
+_HTML_POST = """;
         
-        function renderValue(value, key = null) {{
-            if (!value) return '<span class="null">null</span>';
-            
-            const type = value.type;
+        // element ids of expandable values; call nodes use the id from Python
+        let __nid = 0;
+        
+        // Render functions append HTML fragments to 'out'; the caller joins once
+        function renderValue(value, out) {
+            if (value === null || value === undefined) {
+                out.push('<span class="null">null</span>');
+                return;
+            }
             
-            if (type === 'null') {{
-                return '<span class="null">null</span>';
-            }}
+            if (typeof value === 'string') {
+                out.push('<span class="string">"', escapeHtml(value), '"</span>');
+                return;
+            }
             
-            if (type === 'string') {{
-                const escaped = escapeHtml(value.value);
-                return `<span class="string">"${{escaped}}"</span>`;
-            }}
+            if (typeof value === 'number') {
+                out.push('<span class="number">', value, '</span>');
+                return;
+            }
             
-            if (type === 'number') {{
-                return `<span class="number">${{value.value}}</span>`;
-            }}
+            if (typeof value === 'boolean') {
+                out.push('<span class="boolean">', value, '</span>');
+                return;
+            }
             
-            if (type === 'boolean') {{
-                return `<span class="boolean">${{value.value}}</span>`;
-            }}
+            const type = value.type;
             
-            if (type === 'array' || type === 'tuple') {{
-                const id = 'obj_' + Math.random().toString(36).substr(2, 9);
+            if (type === 'array' || type === 'tuple') {
+                const id = 'obj_' + (++__nid);
                 const typeName = type === 'tuple' ? 'tuple' : 'Array';
-                let html = `<div class="obj-line">`;
-                html += `<span class="obj-expand" onclick="toggleObj('${{id}}')">▶</span>`;
-                html += `<span class="obj-type">${{typeName}}(${{value.length}})</span>`;
-                html += `<div class="obj-content collapsed" id="${{id}}">`;
-                
-                value.value.forEach((item, i) => {{
-                    html += `<div class="obj-line">`;
-                    html += `<span class="obj-key">${{i}}:</span>`;
-                    html += renderValue(item);
-                    html += `</div>`;
-                }});
+                out.push(`<div class="obj-line">`);
+                out.push(`<span class="obj-expand" onclick="toggleObj('${id}')">▶</span>`);
+                out.push(`<span class="obj-type">${typeName}(${value.length})</span>`);
+                out.push(`<div class="obj-content collapsed" id="${id}">`);
                 
-                html += `</div></div>`;
-                return html;
-            }}
-            
-            if (type === 'object') {{
-                const id = 'obj_' + Math.random().toString(36).substr(2, 9);
-                let html = `<div class="obj-line">`;
-                html += `<span class="obj-expand" onclick="toggleObj('${{id}}')">▶</span>`;
-                html += `<span class="obj-type">Object(${{value.keys.length}})</span>`;
-                html += `<div class="obj-content collapsed" id="${{id}}">`;
-                
-                for (const [k, v] of Object.entries(value.value)) {{
-                    html += `<div class="obj-line">`;
-                    html += `<span class="obj-key">${{k}}:</span>`;
-                    html += renderValue(v);
-                    html += `</div>`;
-                }}
+                value.value.forEach((item, i) => {
+                    out.push(`<div class="obj-line"><span class="obj-key">${i}:</span>`);
+                    renderValue(item, out);
+                    out.push(`</div>`);
+                });
                 
-                html += `</div></div>`;
-                return html;
-            }}
+                out.push(`</div></div>`);
+                return;
+            }
             
-            if (type === 'custom') {{
-                const id = 'obj_' + Math.random().toString(36).substr(2, 9);
-                let html = `<div class="obj-line">`;
-                html += `<span class="obj-expand" onclick="toggleObj('${{id}}')">▶</span>`;
-                html += `<span class="obj-type">${{value.class}}</span>`;
-                html += `<div class="obj-content collapsed" id="${{id}}">`;
+            if (type === 'object' || type === 'custom') {
+                const id = 'obj_' + (++__nid);
+                const typeName = type === 'object' ? `Object(${value.keys.length})` : value.class;
+                out.push(`<div class="obj-line">`);
+                out.push(`<span class="obj-expand" onclick="toggleObj('${id}')">▶</span>`);
+                out.push(`<span class="obj-type">${typeName}</span>`);
+                out.push(`<div class="obj-content collapsed" id="${id}">`);
                 
-                for (const [k, v] of Object.entries(value.value)) {{
-                    html += `<div class="obj-line">`;
-                    html += `<span class="obj-key">${{k}}:</span>`;
-                    html += renderValue(v);
-                    html += `</div>`;
-                }}
+                for (const [k, v] of Object.entries(value.value)) {
+                    out.push(`<div class="obj-line"><span class="obj-key">${k}:</span>`);
+                    renderValue(v, out);
+                    out.push(`</div>`);
+                }
                 
-                html += `</div></div>`;
-                return html;
-            }}
+                out.push(`</div></div>`);
+                return;
+            }
             
-            if (type === 'set') {{
-                const id = 'obj_' + Math.random().toString(36).substr(2, 9);
-                let html = `<div class="obj-line">`;
-                html += `<span class="obj-expand" onclick="toggleObj('${{id}}')">▶</span>`;
-                html += `<span class="obj-type">Set(${{value.length}})</span>`;
-                html += `<div class="obj-content collapsed" id="${{id}}">`;
+            if (type === 'set') {
+                const id = 'obj_' + (++__nid);
+                out.push(`<div class="obj-line">`);
+                out.push(`<span class="obj-expand" onclick="toggleObj('${id}')">▶</span>`);
+                out.push(`<span class="obj-type">Set(${value.length})</span>`);
+                out.push(`<div class="obj-content collapsed" id="${id}">`);
                 
-                value.value.forEach((item, i) => {{
-                    html += `<div class="obj-line">`;
-                    html += renderValue(item);
-                    html += `</div>`;
-                }});
+                value.value.forEach(item => {
+                    out.push(`<div class="obj-line">`);
+                    renderValue(item, out);
+                    out.push(`</div>`);
+                });
                 
-                html += `</div></div>`;
-                return html;
-            }}
+                out.push(`</div></div>`);
+                return;
+            }
             
-            return `<span class="obj-value">${{escapeHtml(String(value.value))}}</span>`;
-        }}
+            out.push(`<span class="obj-value">${escapeHtml(String(value.value))}</span>`);
+        }
         
-        function renderNode(node, level = 0) {{
-            if (!node) return '';
+        // Calls this many levels deep start collapsed; their children are
+        // only rendered when first expanded
+        const EXPANDED_LEVELS = 2;
+        
+        // node id -> call whose children have not been rendered yet
+        const unrendered = {};
+        
+        function renderNode(node, out, level = 0) {
+            if (!node) return;
             
-            const nodeId = 'node_' + Math.random().toString(36).substr(2, 9);
-            const childrenId = 'children_' + Math.random().toString(36).substr(2, 9);
-            const paramsId = 'params_' + Math.random().toString(36).substr(2, 9);
+            const nodeId = 'node_' + node.id;
+            const childrenId = 'children_' + node.id;
+            const paramsId = 'params_' + node.id;
+            const hasChildren = node.children && node.children.length > 0;
+            const collapsed = hasChildren && level >= EXPANDED_LEVELS;
             
-            let html = `<div class="call-node">`;
+            out.push(`<div class="call-node" id="${nodeId}">`);
             
             // Call header
-            html += `<div class="call-header" onclick="toggleNode('${{childrenId}}', '${{paramsId}}', this)">`;
-            html += `<span class="toggle">▼</span>`;
-            html += `<span class="func-name">${{node.name}}()</span>`;
-            html += `<span class="return-arrow">→</span>`;
-            html += `<span class="return-value">${{getValuePreview(node.return_val)}}</span>`;
-            html += `<span class="file">[${{node.file}}]</span>`;
-            html += `</div>`;
+            out.push(`<div class="call-header" onclick="toggleNode(${node.id}, this)">`);
+            out.push(`<span class="toggle">${collapsed ? '▶' : '▼'}</span>`);
+            out.push(`<span class="func-name">${node.name}(${node.params === null ? '...' : ''})</span>`);
+            if ('return_val' in node) {
+                out.push(`<span class="return-arrow">→</span>`);
+                out.push(`<span class="return-value">${getValuePreview(node.return_val)}</span>`);
+            }
+            out.push(`<span class="file">[${node.file}]</span>`);
+            out.push(`</div>`);
             
             // Parameters viewer
-            if (Object.keys(node.params).length > 0) {{
-                html += `<div class="object-viewer" id="${{paramsId}}">`;
-                html += `<div style="color: #4ec9b0; margin-bottom: 8px; font-weight: bold;">Parameters:</div>`;
-                for (const [key, value] of Object.entries(node.params)) {{
-                    html += `<div class="obj-line">`;
-                    html += `<span class="obj-key">${{key}}:</span>`;
-                    html += renderValue(value);
-                    html += `</div>`;
-                }}
-                html += `</div>`;
-            }}
+            if (node.params && Object.keys(node.params).length > 0) {
+                out.push(`<div class="object-viewer${collapsed ? ' collapsed' : ''}" id="${paramsId}">`);
+                out.push(`<div style="color: #4ec9b0; margin-bottom: 8px; font-weight: bold;">Parameters:</div>`);
+                for (const [key, value] of Object.entries(node.params)) {
+                    out.push(`<div class="obj-line"><span class="obj-key">${key}:</span>`);
+                    renderValue(value, out);
+                    out.push(`</div>`);
+                }
+                out.push(`</div>`);
+            }
             
             // Children
-            if (node.children && node.children.length > 0) {{
-                html += `<div class="children" id="${{childrenId}}">`;
-                node.children.forEach(child => {{
-                    html += renderNode(child, level + 1);
-                }});
-                html += `</div>`;
-            }}
+            if (collapsed) {
+                unrendered[node.id] = node;
+                out.push(`<div class="children collapsed" id="${childrenId}"></div>`);
+            } else if (hasChildren) {
+                out.push(`<div class="children" id="${childrenId}">`);
+                node.children.forEach(child => renderNode(child, out, level + 1));
+                out.push(`</div>`);
+            }
             
-            html += `</div>`;
-            return html;
-        }}
+            out.push(`</div>`);
+        }
         
-        function getValuePreview(value) {{
-            if (!value) return 'null';
+        function getValuePreview(value) {
+            if (value === null || value === undefined) return 'null';
+            if (typeof value === 'string') return `"${value.substring(0, 30)}${value.length > 30 ? '...' : ''}"`;
+            if (typeof value !== 'object') return String(value);
             
             const type = value.type;
             
-            if (type === 'null') return 'null';
-            if (type === 'string') return `"${{value.value.substring(0, 30)}}${{value.value.length > 30 ? '...' : ''}}"`;
-            if (type === 'number') return String(value.value);
-            if (type === 'boolean') return String(value.value);
-            if (type === 'array') return `Array(${{value.length}})`;
-            if (type === 'tuple') return `tuple(${{value.length}})`;
-            if (type === 'object') return `Object(${{value.keys.length}})`;
+            if (type === 'array') return `Array(${value.length})`;
+            if (type === 'tuple') return `tuple(${value.length})`;
+            if (type === 'object') return `Object(${value.keys.length})`;
             if (type === 'custom') return value.class;
-            if (type === 'set') return `Set(${{value.length}})`;
+            if (type === 'set') return `Set(${value.length})`;
             
             return String(value.value).substring(0, 30);
-        }}
+        }
         
-        function toggleNode(childrenId, paramsId, header) {{
-            const children = document.getElementById(childrenId);
-            const params = document.getElementById(paramsId);
+        function toggleNode(id, header) {
+            const children = document.getElementById('children_' + id);
+            const params = document.getElementById('params_' + id);
             const toggle = header.querySelector('.toggle');
             
-            if (children) {{
+            const node = unrendered[id];
+            if (node) {
+                // first expand: render the children one level at a time
+                delete unrendered[id];
+                const parts = [];
+                node.children.forEach(child => renderNode(child, parts, EXPANDED_LEVELS));
+                children.innerHTML = parts.join('');
+            }
+            
+            if (children) {
                 children.classList.toggle('collapsed');
-            }}
-            if (params) {{
+            }
+            if (params) {
                 params.classList.toggle('collapsed');
-            }}
+            }
             
             toggle.textContent = toggle.textContent === '▼' ? '▶' : '▼';
-        }}
+        }
         
-        function toggleObj(id) {{
+        function toggleObj(id) {
             const el = document.getElementById(id);
             const toggle = el.previousElementSibling;
             
             el.classList.toggle('collapsed');
             toggle.textContent = toggle.textContent === '▶' ? '▼' : '▶';
-        }}
+        }
         
-        function escapeHtml(text) {{
+        function escapeHtml(text) {
             const div = document.createElement('div');
             div.textContent = text;
             return div.innerHTML;
-        }}
+        }
         
         // Render the tree
-        document.getElementById('callTree').innerHTML = renderNode(traceData);
+        const parts = [];
+        renderNode(traceData, parts);
+        document.getElementById('callTree').innerHTML = parts.join('');
     </script>
 </body>
-</html>"""
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        print(f"\n✓ Interactive trace saved to {filename}")
-        print(f"  Open it in your browser to explore the call tree!")
-
-
-# ---------- GLOBAL INSTANCE ----------
-trace = CallTracer()
+</html>""".encode("utf-8")
@@ -0,0 +1,78 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from pytrace_method import CallTracer, replay
+
+
+def leaf(value):
+    return value * 2
+
+
+def branch(values, label="b"):
+    total = leaf(values[0]) + leaf(1)
+    return [total, len(label)]
+
+
+def program():
+    branch([3, None])
+    return leaf(5)
+
+
+class StreamReplayTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".bin")
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def _lines(self, tracer, root):
+        return list(tracer._tree_lines(root))
+
+    def test_replay_matches_in_memory_tree(self):
+        tracer = CallTracer()
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracer.start()
+            program()
+            tracer.end()
+        expected = self._lines(tracer, tracer.root)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracer.stream(self.path)
+            program()
+            tracer.end()
+        replayed = replay(self.path)
+
+        self.assertEqual(self._lines(tracer, replayed), expected)
+        self.assertEqual(replayed.name, "program")
+        self.assertEqual(replayed.return_val, "10")
+
+    def test_empty_stream_replays_to_none(self):
+        tracer = CallTracer()
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracer.stream(self.path)
+            tracer.end()
+        self.assertIsNone(replay(self.path))
+
+    def test_stream_applies_to_one_trace(self):
+        tracer = CallTracer()
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracer.stream(self.path)
+            program()
+            tracer.end()
+            size = os.path.getsize(self.path)
+
+            tracer.start()
+            program()
+            tracer.end()
+
+        self.assertIsNone(tracer.stream_file)
+        self.assertEqual(os.path.getsize(self.path), size)
+        self.assertEqual(tracer.root.name, "program")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,299 @@
+import contextlib
+import io
+import json
+import textwrap
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from pytrace_method import CallTracer, replay
+from pytrace_method import tracer as tracer_module
+
+
+def run_traced(func, tracer=None):
+    """Trace one top-level call and return the tracer and its tree's lines"""
+    tracer = tracer or CallTracer()
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracer.start()
+        func()
+        tracer.end()
+    return tracer, list(tracer._tree_lines(tracer.root))
+
+
+def sort_data():
+    return sorted([3, 1, 2])
+
+
+def top(data):
+    return sorted(data)
+
+
+def sort_through_top():
+    return top([3, 1, 2])
+
+
+def recurse(n):
+    return 0 if n == 0 else recurse(n - 1) + 1
+
+
+def after():
+    return "after"
+
+
+def deep_then_shallow():
+    recurse(10)
+    return after()
+
+
+def pair(x):
+    return [sort_data(), x]
+
+
+def chain():
+    return pair(1)
+
+
+class BuiltinCallTest(unittest.TestCase):
+    def test_builtin_return_value_is_not_invented(self):
+        _, lines = run_traced(sort_data)
+        self.assertEqual(lines[0], "sort_data() -> [1, 2, 3] [test_tracer.py]\n")
+        self.assertEqual(lines[1], "  sorted(...) [test_tracer.py]\n")
+
+    def test_builtin_in_text_stream_and_replay(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            tracer = CallTracer()
+            with contextlib.redirect_stdout(io.StringIO()):
+                tracer.save(path, stream=True)
+                sort_data()
+                tracer.end()
+            with open(path, encoding="utf-8") as f:
+                self.assertIn("  sorted(...) [test_tracer.py]\n", f.read())
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                tracer.stream(path)
+                sort_data()
+                tracer.end()
+            lines = list(tracer._tree_lines(replay(path)))
+            self.assertEqual(lines[1], "  sorted(...) [test_tracer.py]\n")
+        finally:
+            os.remove(path)
+
+    def test_builtin_in_html_data(self):
+        fd, path = tempfile.mkstemp(suffix=".html")
+        os.close(fd)
+        try:
+            tracer = CallTracer()
+            with contextlib.redirect_stdout(io.StringIO()):
+                tracer.interactive(path)
+                sort_data()
+                tracer.end()
+        finally:
+            os.remove(path)
+        data = json.loads(json.dumps(tracer._node_to_dict(tracer.root)))
+        builtin = data["children"][0]
+        self.assertEqual(builtin["name"], "sorted")
+        self.assertIsNone(builtin["params"])
+        self.assertNotIn("return_val", builtin)
+        self.assertEqual(data["return_val"]["type"], "array")
+
+
+def worker_leaf(i):
+    return i
+
+
+def worker(n):
+    for _ in range(200):
+        worker_leaf(n)
+    return n
+
+
+def pause():
+    # sleeping releases the GIL, so other threads run during the trace
+    for _ in range(5):
+        time.sleep(0.002)
+    return "done"
+
+
+def wrap_text():
+    # standard library frames are ignored by the tracer
+    return textwrap.wrap("a b")
+
+
+def fail(x):
+    raise ValueError(x)
+
+
+def catch(x):
+    try:
+        fail(x)
+    except ValueError:
+        return "caught"
+
+
+def countdown(n):
+    while n:
+        try:
+            yield n
+        except KeyError:
+            yield -n
+        n -= 1
+
+
+def mixed():
+    values = list(countdown(2))
+    gen = countdown(3)
+    next(gen)
+    thrown = gen.throw(KeyError)
+    gen.close()
+    try:
+        catch(1)
+        fail(2)
+    except ValueError:
+        pass
+    return values, thrown
+
+
+class BackendTest(unittest.TestCase):
+    def test_other_threads_are_not_traced(self):
+        started = threading.Event()
+        stop = threading.Event()
+
+        def run():
+            started.set()
+            while not stop.is_set():
+                worker(1)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        started.wait()
+        try:
+            _, lines = run_traced(pause)
+        finally:
+            stop.set()
+            thread.join()
+        self.assertEqual(lines, ["pause() -> 'done' [test_tracer.py]\n"]
+                         + ["  sleep(...) [test_tracer.py]\n"] * 5)
+
+    @unittest.skipUnless(sys.version_info >= (3, 12), "sys.monitoring needs Python 3.12+")
+    def test_monitoring_matches_setprofile(self):
+        tracer, monitored = run_traced(mixed)
+        self.assertTrue(tracer._monitoring)
+        with mock.patch.object(tracer_module, "_MONITORING", False):
+            tracer, profiled = run_traced(mixed)
+        self.assertFalse(tracer._monitoring)
+        self.assertEqual(monitored, profiled)
+
+    def test_settrace_fallback_next_to_c_profiler(self):
+        # a C profiler holds the profile hook (and, on 3.12+, the tool id)
+        monitoring = sys.version_info >= (3, 12)
+        if monitoring:
+            sys.monitoring.use_tool_id(sys.monitoring.PROFILER_ID, "test")
+        try:
+            with mock.patch.object(sys, "getprofile", return_value=object()):
+                with self.assertWarns(RuntimeWarning):
+                    tracer, lines = run_traced(wrap_text)
+        finally:
+            if monitoring:
+                sys.monitoring.free_tool_id(sys.monitoring.PROFILER_ID)
+        self.assertIsNone(sys.gettrace())
+        self.assertEqual(lines, ["wrap_text() -> ['a b'] [test_tracer.py]\n"])
+
+    @unittest.skipUnless(sys.version_info >= (3, 12), "sys.monitoring needs Python 3.12+")
+    def test_ignored_call_sites_are_disabled(self):
+        tracer, _ = run_traced(wrap_text)
+        code = textwrap.TextWrapper._split_chunks.__code__
+        # a call from ignored code to a Python function is disabled too
+        result = tracer._on_c_call(code, 0, wrap_text, None)
+        self.assertIs(result, sys.monitoring.DISABLE)
+
+    @unittest.skipUnless(sys.version_info >= (3, 12), "sys.monitoring needs Python 3.12+")
+    def test_restart_events_only_when_filters_change(self):
+        tracer, _ = run_traced(wrap_text)
+        with mock.patch.object(sys.monitoring, "restart_events") as restart:
+            run_traced(wrap_text, tracer)
+            restart.assert_not_called()
+            run_traced(wrap_text, tracer.include_stdlib())
+            restart.assert_called_once()
+
+
+class MaxDepthTest(unittest.TestCase):
+    expected = [
+        "deep_then_shallow() -> 'after' [test_tracer.py]\n",
+        "  recurse(n=10) -> 10 [test_tracer.py]\n",
+        "    recurse(n=9) -> 9 [test_tracer.py]\n",
+        "      recurse(n=8) -> 8 [test_tracer.py]\n",
+        "  after() -> 'after' [test_tracer.py]\n",
+    ]
+
+    def _tracer(self):
+        tracer = CallTracer()
+        tracer.max_depth = 3
+        return tracer
+
+    def test_tree_resumes_after_passing_max_depth(self):
+        tracer, lines = run_traced(deep_then_shallow, self._tracer())
+        self.assertEqual(lines, self.expected)
+
+        # a later top-level call is recorded as well
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracer.start()
+            recurse(10)
+            after()
+            tracer.end()
+        self.assertEqual(tracer.root.name, "after")
+        self.assertEqual(tracer.depth, 0)
+
+    def test_text_stream_resumes_after_passing_max_depth(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            tracer = self._tracer()
+            with contextlib.redirect_stdout(io.StringIO()):
+                tracer.save(path, stream=True)
+                deep_then_shallow()
+                after()
+                tracer.end()
+            with open(path, encoding="utf-8") as f:
+                lines = f.readlines()
+        finally:
+            os.remove(path)
+        self.assertEqual(lines[2:], [
+            "deep_then_shallow() [test_tracer.py]\n",
+            "  recurse(n=10) [test_tracer.py]\n",
+            "    recurse(n=9) [test_tracer.py]\n",
+            "      recurse(n=8) -> 8 [test_tracer.py]\n",
+            "    recurse -> 9\n",
+            "  recurse -> 10\n",
+            "  after() -> 'after' [test_tracer.py]\n",
+            "deep_then_shallow -> 'after'\n",
+            "after() -> 'after' [test_tracer.py]\n",
+        ])
+
+
+class CompressTest(unittest.TestCase):
+    def test_builtin_is_not_folded_into_python_call(self):
+        tracer = CallTracer().compress()
+        _, lines = run_traced(sort_through_top, tracer)
+        self.assertEqual(lines, [
+            "sort_through_top→top(data=[3, 1, 2]) -> [1, 2, 3] [test_tracer.py]\n",
+            "  sorted(...) [test_tracer.py]\n",
+        ])
+
+    def test_adopted_children_point_at_merged_node(self):
+        tracer = CallTracer().compress()
+        run_traced(chain, tracer)
+        root = tracer.root
+        self.assertEqual(root.name, "chain→pair→sort_data")
+        self.assertEqual(root.return_val, "[1, 2, 3]")
+        for child in root.children:
+            self.assertIs(child.parent, root)
+
+
+if __name__ == "__main__":
+    unittest.main()